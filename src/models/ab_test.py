@@ -6,18 +6,334 @@ Statistical testing framework for A/B experiments with power analysis and sequen
 Author: Gabriel Demetrios Lafis
 """
 
+import functools
+import operator
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+
 import numpy as np
-import pandas as pd
-from scipy import stats
+from scipy import special, stats
+from scipy.special import ndtr, ndtri, stdtr, stdtrit
 from typing import Dict, Tuple, Optional
+from numpy.typing import ArrayLike
 from loguru import logger
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Fallback no-op decorator when numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# P-value of a standardized statistic under each alternative hypothesis
+_Z_PVALUE = {
+    'two-sided': lambda z, cdf=ndtr: 2 * cdf(-abs(z)),
+    'greater': lambda z, cdf=ndtr: cdf(-z),
+    'less': lambda z, cdf=ndtr: cdf(z),
+}
+_T_PVALUE = {
+    'two-sided': lambda t, df: 2 * stdtr(df, -abs(t)),
+    'greater': lambda t, df: stdtr(df, -t),
+    'less': lambda t, df: stdtr(df, t),
+}
+
+
+def _array_namespace(*arrays):
+    """
+    Select the array module and special-function module for the inputs.
+    
+    Returns:
+        Tuple of (cupy, cupyx.scipy.special) if any input is a CuPy array,
+        otherwise (numpy, scipy.special)
+    """
+    for x in arrays:
+        if type(x).__module__.split('.')[0] == 'cupy':
+            import cupy
+            import cupyx.scipy.special
+            return cupy, cupyx.scipy.special
+    return np, special
+
+
+@njit(cache=True, error_model='numpy')
+def _prop_z_core(cc, ct, tc, tt):
+    """
+    Scalar arithmetic of the two-proportion z-test.
+    
+    Returns:
+        Tuple of (control rate, treatment rate, z-statistic, unpooled SE)
+    """
+    p1 = cc / ct
+    p2 = tc / tt
+    pp = (cc + tc) / (ct + tt)
+    se = np.sqrt(pp * (1 - pp) * (1/ct + 1/tt))
+    z = (p2 - p1) / se
+    ci_se = np.sqrt(p1 * (1 - p1) / ct + p2 * (1 - p2) / tt)
+    return p1, p2, z, ci_se
+
+
+@njit(cache=True, error_model='numpy', fastmath={'reassoc', 'contract'})
+def _moments(x):
+    """
+    Single-pass sample mean and unbiased variance.
+    
+    Accumulates the sum and sum of squares of ``x - x[0]`` in float64.
+    Shifting by a sample value keeps the variance accurate when the mean
+    is large relative to the spread, and leaves no per-element division,
+    so the reassociated loop vectorizes.
+    
+    Returns:
+        Tuple of (mean, variance, n)
+    """
+    n = x.shape[0]
+    if n == 0:
+        return np.nan, np.nan, n
+    shift = np.float64(x[0])
+    s = 0.0
+    ss = 0.0
+    for i in range(n):
+        d = x[i] - shift
+        s += d
+        ss += d * d
+    if n == 1:
+        return shift, np.nan, n
+    return shift + s / n, (ss - s * s / n) / (n - 1), n
+
+
+def _mean_var(x: np.ndarray) -> Tuple[float, float, int]:
+    """
+    Sample mean, unbiased variance and size of a 1-D array.
+    
+    Uses the compiled single-pass kernel when numba is available. float32
+    input is read as-is; the mean and the squared deviations are always
+    accumulated in float64.
+    """
+    x = np.asarray(x)
+    if x.dtype != np.float32:
+        x = x.astype(np.float64, copy=False)
+    if NUMBA_AVAILABLE:
+        mean, var, n = _moments(x)
+        return np.float64(mean), np.float64(var), n
+    n = len(x)
+    mean = x.mean(dtype=np.float64)
+    dev = x - mean
+    var = np.dot(dev, dev) / (n - 1) if n > 1 else np.float64(np.nan)
+    return mean, var, n
+
+
+@functools.lru_cache(maxsize=None)
+def _power_solvers():
+    """
+    Import the statsmodels power solvers once, on first use.
+    
+    statsmodels imports pandas, so deferring it keeps both out of the
+    module import.
+    
+    Returns:
+        Tuple of (zt_ind_solve_power, tt_ind_solve_power)
+    """
+    from statsmodels.stats.power import zt_ind_solve_power, tt_ind_solve_power
+    return zt_ind_solve_power, tt_ind_solve_power
+
+
+@functools.lru_cache(maxsize=1024)
+def _solve_n(
+    alpha: float,
+    power: float,
+    alternative: str,
+    baseline_rate: float,
+    mde: float,
+    metric_type: str
+) -> int:
+    """
+    Solve for the required sample size per group (memoized).
+    
+    Args:
+        alpha: Significance level
+        power: Statistical power
+        alternative: Alternative hypothesis
+        baseline_rate: Baseline conversion rate or mean
+        mde: Minimum detectable effect (absolute)
+        metric_type: Type of metric ('proportion' or 'continuous')
+        
+    Returns:
+        Required sample size per group
+    """
+    zt_ind_solve_power, tt_ind_solve_power = _power_solvers()
+    
+    if metric_type == 'proportion':
+        # Calculate effect size (Cohen's h)
+        p1 = baseline_rate
+        p2 = baseline_rate + mde
+        effect_size = 2 * (np.arcsin(np.sqrt(p2)) - np.arcsin(np.sqrt(p1)))
+            
+        # Calculate sample size
+        n = zt_ind_solve_power(
+            effect_size=effect_size,
+            alpha=alpha,
+            power=power,
+            alternative=alternative
+        )
+    else:
+        # For continuous metrics, assume effect size
+        effect_size = mde / baseline_rate if baseline_rate != 0 else mde
+            
+        n = tt_ind_solve_power(
+            effect_size=effect_size,
+            alpha=alpha,
+            power=power,
+            alternative=alternative
+        )
+    
+    return int(np.ceil(n))
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names(cls) -> Tuple[str, ...]:
+    """Field names of a result dataclass, computed once per class."""
+    return tuple(f.name for f in fields(cls))
+
+
+class _TestResult(Mapping):
+    """
+    Read-only mapping view of result dataclasses.
+    
+    Fields hold floats for a single test or arrays (one element per test)
+    for batched calls; ``results['p_value']`` and ``results.p_value`` are
+    equivalent. Only field names are keys, so ``dict(results)``, iteration
+    and ``results.get`` behave like the plain dicts returned before.
+    """
+    
+    __slots__ = ()
+    
+    def __getitem__(self, key: str):
+        if key not in _field_names(type(self)):
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self):
+        return iter(_field_names(type(self)))
+    
+    def __len__(self) -> int:
+        return len(_field_names(type(self)))
+    
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in self}
+    
+    def to_frame(self):
+        """
+        Convert to a DataFrame with one row per test.
+        
+        The confidence interval is split into ``ci_lower``/``ci_upper``.
+        pandas is imported here rather than at module level, so only callers
+        that want a DataFrame pay for it.
+        
+        Returns:
+            pandas DataFrame
+        """
+        import pandas as pd
+        
+        columns = {}
+        for key, value in self.to_dict().items():
+            if key == 'confidence_interval':
+                columns['ci_lower'] = np.atleast_1d(value[0])
+                columns['ci_upper'] = np.atleast_1d(value[1])
+            else:
+                columns[key] = np.atleast_1d(value)
+        return pd.DataFrame(columns)
+
+
+@dataclass
+class ProportionResult(_TestResult):
+    """Results of a two-proportion z-test."""
+    
+    __slots__ = (
+        'control_rate', 'treatment_rate', 'absolute_lift', 'relative_lift',
+        'z_statistic', 'p_value', 'significant', 'confidence_interval'
+    )
+    
+    control_rate: ArrayLike
+    treatment_rate: ArrayLike
+    absolute_lift: ArrayLike
+    relative_lift: ArrayLike
+    z_statistic: ArrayLike
+    p_value: ArrayLike
+    significant: ArrayLike
+    confidence_interval: Tuple[ArrayLike, ArrayLike]
+
+
+@dataclass
+class SequentialResult(ProportionResult):
+    """Results of a sequential test at one or more looks."""
+    
+    __slots__ = ('spent_alpha', 'sample_fraction')
+    
+    spent_alpha: ArrayLike
+    sample_fraction: ArrayLike
+
+
+@dataclass
+class TTestResult(_TestResult):
+    """Results of an independent t-test."""
+    
+    __slots__ = (
+        'control_mean', 'treatment_mean', 'control_std', 'treatment_std',
+        'absolute_lift', 'relative_lift', 't_statistic', 'p_value',
+        'degrees_of_freedom', 'significant', 'confidence_interval'
+    )
+    
+    control_mean: float
+    treatment_mean: float
+    control_std: float
+    treatment_std: float
+    absolute_lift: float
+    relative_lift: float
+    t_statistic: float
+    p_value: float
+    degrees_of_freedom: float
+    significant: bool
+    confidence_interval: Tuple[float, float]
+
+
+@dataclass
+class MannWhitneyResult(_TestResult):
+    """Results of a Mann-Whitney U test."""
+    
+    __slots__ = (
+        'control_median', 'treatment_median', 'u_statistic', 'p_value', 'significant'
+    )
+    
+    control_median: float
+    treatment_median: float
+    u_statistic: float
+    p_value: float
+    significant: bool
+
+
+@dataclass
+class PermutationResult(_TestResult):
+    """Results of a permutation test."""
+    
+    __slots__ = ('statistic', 'p_value', 'n_permutations', 'significant')
+    
+    statistic: float
+    p_value: float
+    n_permutations: int
+    significant: bool
+
 
 class ABTest:
     """
     A/B testing framework with statistical analysis.
     """
     
+    clear_sample_size_cache = staticmethod(_solve_n.cache_clear)
+    
     def __init__(
         self,
         alpha: float = 0.05,
@@ -36,7 +352,35 @@ class ABTest:
         self.power = power
         self.alternative = alternative
         
-        logger.info(f"Initialized A/B test with alpha={alpha}, power={power}")
+        # arcsin(sqrt(baseline)) per baseline rate, reused across power curves
+        self._arcsin_baseline: Dict[float, float] = {}
+        
+        logger.info("Initialized A/B test with alpha={}, power={}", alpha, power)
+    
+    @property
+    def alpha(self) -> float:
+        """Significance level."""
+        return self._alpha
+    
+    @alpha.setter
+    def alpha(self, value: float):
+        self._alpha = value
+        # Two-sided critical value from the lower tail, exact for tiny alpha
+        self._z_alpha2 = float(-ndtri(value/2))
+    
+    @property
+    def alternative(self) -> str:
+        """Alternative hypothesis ('two-sided', 'greater', 'less')."""
+        return self._alternative
+    
+    @alternative.setter
+    def alternative(self, value: str):
+        if value not in _Z_PVALUE:
+            raise ValueError(f"alternative must be one of {list(_Z_PVALUE)}, got {value!r}")
+        self._alternative = value
+        # Resolve the p-value formulas once instead of on every test
+        self._pvalue_fn = _Z_PVALUE[value]
+        self._tpvalue_fn = _T_PVALUE[value]
     
     def calculate_sample_size(
         self,
@@ -55,101 +399,233 @@ class ABTest:
         Returns:
             Required sample size per group
         """
-        from statsmodels.stats.power import zt_ind_solve_power, tt_ind_solve_power
+        sample_size = _solve_n(
+            self.alpha, self.power, self.alternative,
+            baseline_rate, mde, metric_type
+        )
         
-        if metric_type == 'proportion':
-            # Calculate effect size (Cohen's h)
-            p1 = baseline_rate
-            p2 = baseline_rate + mde
-            effect_size = 2 * (np.arcsin(np.sqrt(p2)) - np.arcsin(np.sqrt(p1)))
+        logger.info("Required sample size per group: {}", sample_size)
+        
+        return sample_size
+    
+    def calculate_sample_size_curve(
+        self,
+        baseline_rate: float,
+        mdes: ArrayLike,
+        metric_type: str = 'proportion'
+    ) -> np.ndarray:
+        """
+        Calculate required sample size per group over a grid of effects.
+        
+        Args:
+            baseline_rate: Baseline conversion rate or mean
+            mdes: Minimum detectable effects (absolute)
+            metric_type: Type of metric ('proportion' or 'continuous')
             
-            # Calculate sample size
-            n = zt_ind_solve_power(
-                effect_size=effect_size,
-                alpha=self.alpha,
-                power=self.power,
-                alternative=self.alternative
-            )
+        Returns:
+            Array of required sample sizes per group, one per MDE
+        """
+        zt_ind_solve_power, tt_ind_solve_power = _power_solvers()
+        mdes = np.asarray(mdes, dtype=float)
+        
+        if metric_type == 'proportion':
+            # Cohen's h with the baseline term computed once
+            a1 = self._arcsin_baseline.get(baseline_rate)
+            if a1 is None:
+                a1 = self._arcsin_baseline[baseline_rate] = float(np.arcsin(np.sqrt(baseline_rate)))
+            effect_sizes = 2 * (np.arcsin(np.sqrt(baseline_rate + mdes)) - a1)
+            solve_power = zt_ind_solve_power
         else:
-            # For continuous metrics, assume effect size
-            effect_size = mde / baseline_rate if baseline_rate != 0 else mde
-            
-            n = tt_ind_solve_power(
+            effect_sizes = mdes / baseline_rate if baseline_rate != 0 else mdes
+            solve_power = tt_ind_solve_power
+        
+        n = np.array([
+            solve_power(
                 effect_size=effect_size,
                 alpha=self.alpha,
                 power=self.power,
                 alternative=self.alternative
             )
+            for effect_size in effect_sizes.ravel()
+        ]).reshape(effect_sizes.shape)
         
-        sample_size = int(np.ceil(n))
-        logger.info(f"Required sample size per group: {sample_size}")
+        sample_sizes = np.ceil(n).astype(int)
+        logger.info("Computed sample sizes for {} effect sizes", sample_sizes.size)
         
-        return sample_size
+        return sample_sizes
     
     def proportion_test(
         self,
-        control_conversions: int,
-        control_total: int,
-        treatment_conversions: int,
-        treatment_total: int
-    ) -> Dict:
+        control_conversions: ArrayLike,
+        control_total: ArrayLike,
+        treatment_conversions: ArrayLike,
+        treatment_total: ArrayLike,
+        alpha: Optional[ArrayLike] = None
+    ) -> ProportionResult:
         """
         Two-proportion z-test.
         
+        Accepts either scalars (one experiment) or 1-D arrays (one
+        experiment per element), in which case every statistic in the
+        returned result is an array evaluated across the whole batch.
+        
         Args:
             control_conversions: Number of conversions in control
             control_total: Total in control group
             treatment_conversions: Number of conversions in treatment
             treatment_total: Total in treatment group
+            alpha: Significance level for this call, scalar or one per
+                experiment (defaults to self.alpha)
             
         Returns:
-            Dictionary with test results
+            ProportionResult with test results
         """
-        logger.info("Running two-proportion z-test...")
-        
-        # Calculate proportions
-        p_control = control_conversions / control_total
-        p_treatment = treatment_conversions / treatment_total
+        if np.ndim(control_conversions) or np.ndim(control_total) or \
+                np.ndim(treatment_conversions) or np.ndim(treatment_total) or \
+                np.ndim(alpha):
+            return self._proportion_test_batch(
+                control_conversions, control_total,
+                treatment_conversions, treatment_total,
+                alpha=alpha
+            )
         
-        # Pooled proportion
-        p_pooled = (control_conversions + treatment_conversions) / (control_total + treatment_total)
+        if not (control_total > 0 and treatment_total > 0):
+            raise ValueError("control_total and treatment_total must be positive")
         
-        # Standard error
-        se = np.sqrt(p_pooled * (1 - p_pooled) * (1/control_total + 1/treatment_total))
+        if alpha is None:
+            alpha, z_alpha2 = self.alpha, self._z_alpha2
+        else:
+            z_alpha2 = float(-ndtri(alpha/2))
         
-        # Z-statistic
-        z_stat = (p_treatment - p_control) / se
+        # Proportions, z-statistic and unpooled SE
+        p_control, p_treatment, z_stat, ci_se = _prop_z_core(
+            float(control_conversions), float(control_total),
+            float(treatment_conversions), float(treatment_total)
+        )
         
         # P-value
-        if self.alternative == 'two-sided':
-            p_value = 2 * (1 - stats.norm.cdf(abs(z_stat)))
-        elif self.alternative == 'greater':
-            p_value = 1 - stats.norm.cdf(z_stat)
-        else:  # less
-            p_value = stats.norm.cdf(z_stat)
+        p_value = self._pvalue_fn(z_stat)
         
         # Confidence interval
-        ci_se = np.sqrt(p_control * (1 - p_control) / control_total + 
-                       p_treatment * (1 - p_treatment) / treatment_total)
-        ci_margin = stats.norm.ppf(1 - self.alpha/2) * ci_se
+        ci_margin = z_alpha2 * ci_se
         
         lift = (p_treatment - p_control) / p_control if p_control > 0 else 0
         
-        results = {
-            'control_rate': p_control,
-            'treatment_rate': p_treatment,
-            'absolute_lift': p_treatment - p_control,
-            'relative_lift': lift,
-            'z_statistic': z_stat,
-            'p_value': p_value,
-            'significant': p_value < self.alpha,
-            'confidence_interval': (
+        results = ProportionResult(
+            control_rate=p_control,
+            treatment_rate=p_treatment,
+            absolute_lift=p_treatment - p_control,
+            relative_lift=lift,
+            z_statistic=z_stat,
+            p_value=p_value,
+            significant=p_value < alpha,
+            confidence_interval=(
                 p_treatment - p_control - ci_margin,
                 p_treatment - p_control + ci_margin
             )
-        }
+        )
         
-        logger.info(f"Test results: p-value={p_value:.4f}, significant={results['significant']}")
+        logger.info("Test results: p-value={:.4f}, significant={}", p_value, results.significant)
+        
+        return results
+    
+    def _proportion_test_batch(
+        self,
+        control_conversions: ArrayLike,
+        control_total: ArrayLike,
+        treatment_conversions: ArrayLike,
+        treatment_total: ArrayLike,
+        alpha: Optional[ArrayLike] = None
+    ) -> ProportionResult:
+        """
+        Vectorized two-proportion z-test over a batch of experiments.
+        
+        NumPy and CuPy inputs are both supported; results live on the same
+        device as the inputs.
+        
+        Args:
+            control_conversions: Conversions in control, one per experiment
+            control_total: Totals in control, one per experiment
+            treatment_conversions: Conversions in treatment, one per experiment
+            treatment_total: Totals in treatment, one per experiment
+            alpha: Significance level, scalar or one per experiment
+                (defaults to self.alpha)
+            
+        Returns:
+            ProportionResult with test results, each field an array
+        """
+        xp, sp = _array_namespace(
+            control_conversions, control_total,
+            treatment_conversions, treatment_total, alpha
+        )
+        cc = xp.asarray(control_conversions, dtype=float)
+        ct = xp.asarray(control_total, dtype=float)
+        tc = xp.asarray(treatment_conversions, dtype=float)
+        tt = xp.asarray(treatment_total, dtype=float)
+        
+        if not (bool(xp.all(ct > 0)) and bool(xp.all(tt > 0))):
+            raise ValueError("control_total and treatment_total must be positive")
+        
+        if alpha is None:
+            cc, ct, tc, tt = xp.broadcast_arrays(cc, ct, tc, tt)
+            alpha, z_alpha2 = self.alpha, self._z_alpha2
+        else:
+            cc, ct, tc, tt, alpha = xp.broadcast_arrays(
+                cc, ct, tc, tt, xp.asarray(alpha, dtype=float)
+            )
+            z_alpha2 = -sp.ndtri(alpha / 2)
+        
+        # Calculate proportions
+        p_control = cc / ct
+        p_treatment = tc / tt
+        diff = p_treatment - p_control
+        
+        # Pooled SE, sqrt((cc + tc) * (1 - p_pooled) / (ct * tt)), built in
+        # place in two scratch buffers; the result becomes the z-statistic
+        buf = xp.add(cc, tc)
+        tmp = xp.add(ct, tt)
+        xp.divide(buf, tmp, out=tmp)
+        xp.subtract(1, tmp, out=tmp)
+        buf *= tmp
+        xp.multiply(ct, tt, out=tmp)
+        buf /= tmp
+        xp.sqrt(buf, out=buf)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_stat = xp.divide(diff, buf, out=buf)
+        
+        # P-value
+        p_value = self._pvalue_fn(z_stat, sp.ndtr)
+        
+        # Unpooled SE for the confidence interval, reusing tmp
+        ci_margin = xp.subtract(1, p_control)
+        ci_margin *= p_control
+        ci_margin /= ct
+        xp.subtract(1, p_treatment, out=tmp)
+        tmp *= p_treatment
+        tmp /= tt
+        ci_margin += tmp
+        xp.sqrt(ci_margin, out=ci_margin)
+        ci_margin *= z_alpha2
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lift = xp.where(p_control > 0, diff / p_control, 0.0)
+        
+        significant = p_value < alpha
+        results = ProportionResult(
+            control_rate=p_control,
+            treatment_rate=p_treatment,
+            absolute_lift=diff,
+            relative_lift=lift,
+            z_statistic=z_stat,
+            p_value=p_value,
+            significant=significant,
+            confidence_interval=(diff - ci_margin, diff + ci_margin)
+        )
+        
+        logger.opt(lazy=True).info(
+            "Test results: {}/{} significant",
+            lambda: int(significant.sum()), lambda: significant.size
+        )
         
         return results
     
@@ -157,68 +633,101 @@ class ABTest:
         self,
         control_data: np.ndarray,
         treatment_data: np.ndarray,
-        equal_var: bool = False
-    ) -> Dict:
+        equal_var: bool = False,
+        compute_dtype: Optional[str] = None
+    ) -> TTestResult:
         """
         Independent t-test for continuous metrics.
         
+        float32 input is read as-is; other dtypes are converted to float64
+        before the moment pass. ``compute_dtype='float32'`` makes that
+        conversion write float32 instead, which pays off for compact
+        non-float data (e.g. int8 0/1 conversions). It does not help float64
+        input, where the extra cast costs more than the moment pass it
+        shortens. p-values and confidence intervals typically agree with
+        float64 to ~1e-5. If the mean is too large relative to the spread
+        for float32 to resolve the variance, the data are recomputed in
+        float64 with a warning.
+        
         Args:
             control_data: Control group data
             treatment_data: Treatment group data
             equal_var: Whether to assume equal variance
+            compute_dtype: Optional dtype to compute the moments in,
+                'float32' or 'float64'
             
         Returns:
-            Dictionary with test results
+            TTestResult with test results
         """
-        logger.info("Running independent t-test...")
-        
         # Calculate statistics
-        control_mean = np.mean(control_data)
-        treatment_mean = np.mean(treatment_data)
-        control_std = np.std(control_data, ddof=1)
-        treatment_std = np.std(treatment_data, ddof=1)
-        
-        # Perform t-test
-        t_stat, p_value = stats.ttest_ind(
-            treatment_data,
-            control_data,
-            equal_var=equal_var,
-            alternative=self.alternative
-        )
-        
-        # Confidence interval
-        n1, n2 = len(control_data), len(treatment_data)
+        if compute_dtype is None:
+            control_mean, control_var, n1 = _mean_var(control_data)
+            treatment_mean, treatment_var, n2 = _mean_var(treatment_data)
+        else:
+            try:
+                dtype = np.dtype(compute_dtype)
+            except TypeError:
+                dtype = None
+            if dtype not in (np.float32, np.float64):
+                raise ValueError(f"compute_dtype must be 'float32' or 'float64', got {compute_dtype!r}")
+            control_mean, control_var, n1 = _mean_var(
+                np.ascontiguousarray(control_data, dtype=compute_dtype))
+            treatment_mean, treatment_var, n2 = _mean_var(
+                np.ascontiguousarray(treatment_data, dtype=compute_dtype))
+            
+            # Values are quantized to eps * |mean|; fall back when that step
+            # is no longer negligible against the standard deviation. Constant
+            # data (zero spread) has nothing to resolve.
+            eps = np.finfo(dtype).eps
+            max_mean = max(abs(control_mean), abs(treatment_mean))
+            min_std = np.sqrt(min(control_var, treatment_var))
+            if min_std > 0 and eps * max_mean > 1e-4 * min_std:
+                logger.warning(
+                    "{} cannot resolve the variance at this mean; recomputing in float64",
+                    compute_dtype
+                )
+                control_mean, control_var, n1 = _mean_var(
+                    np.asarray(control_data, dtype=np.float64))
+                treatment_mean, treatment_var, n2 = _mean_var(
+                    np.asarray(treatment_data, dtype=np.float64))
+        
+        # Standard error and degrees of freedom
         if equal_var:
-            pooled_std = np.sqrt(((n1-1)*control_std**2 + (n2-1)*treatment_std**2) / (n1+n2-2))
-            se = pooled_std * np.sqrt(1/n1 + 1/n2)
+            pooled_var = ((n1-1)*control_var + (n2-1)*treatment_var) / (n1+n2-2)
+            se = np.sqrt(pooled_var * (1/n1 + 1/n2))
             df = n1 + n2 - 2
         else:
-            se = np.sqrt(control_std**2/n1 + treatment_std**2/n2)
-            df = ((control_std**2/n1 + treatment_std**2/n2)**2 / 
-                  ((control_std**2/n1)**2/(n1-1) + (treatment_std**2/n2)**2/(n2-1)))
+            v1, v2 = control_var/n1, treatment_var/n2
+            se = np.sqrt(v1 + v2)
+            df = (v1 + v2)**2 / (v1**2/(n1-1) + v2**2/(n2-1))
+        
+        # T-statistic and p-value
+        t_stat = (treatment_mean - control_mean) / se
+        p_value = self._tpvalue_fn(t_stat, df)
         
-        ci_margin = stats.t.ppf(1 - self.alpha/2, df) * se
+        # Confidence interval
+        ci_margin = -stdtrit(df, self.alpha/2) * se
         
         lift = (treatment_mean - control_mean) / control_mean if control_mean != 0 else 0
         
-        results = {
-            'control_mean': control_mean,
-            'treatment_mean': treatment_mean,
-            'control_std': control_std,
-            'treatment_std': treatment_std,
-            'absolute_lift': treatment_mean - control_mean,
-            'relative_lift': lift,
-            't_statistic': t_stat,
-            'p_value': p_value,
-            'degrees_of_freedom': df,
-            'significant': p_value < self.alpha,
-            'confidence_interval': (
+        results = TTestResult(
+            control_mean=control_mean,
+            treatment_mean=treatment_mean,
+            control_std=np.sqrt(control_var),
+            treatment_std=np.sqrt(treatment_var),
+            absolute_lift=treatment_mean - control_mean,
+            relative_lift=lift,
+            t_statistic=t_stat,
+            p_value=p_value,
+            degrees_of_freedom=df,
+            significant=p_value < self.alpha,
+            confidence_interval=(
                 treatment_mean - control_mean - ci_margin,
                 treatment_mean - control_mean + ci_margin
             )
-        }
+        )
         
-        logger.info(f"Test results: p-value={p_value:.4f}, significant={results['significant']}")
+        logger.info("Test results: p-value={:.4f}, significant={}", p_value, results.significant)
         
         return results
     
@@ -226,7 +735,7 @@ class ABTest:
         self,
         control_data: np.ndarray,
         treatment_data: np.ndarray
-    ) -> Dict:
+    ) -> MannWhitneyResult:
         """
         Mann-Whitney U test (non-parametric).
         
@@ -235,76 +744,178 @@ class ABTest:
             treatment_data: Treatment group data
             
         Returns:
-            Dictionary with test results
+            MannWhitneyResult with test results
         """
-        logger.info("Running Mann-Whitney U test...")
-        
         u_stat, p_value = stats.mannwhitneyu(
             treatment_data,
             control_data,
             alternative=self.alternative
         )
         
-        results = {
-            'control_median': np.median(control_data),
-            'treatment_median': np.median(treatment_data),
-            'u_statistic': u_stat,
-            'p_value': p_value,
-            'significant': p_value < self.alpha
-        }
+        results = MannWhitneyResult(
+            control_median=np.median(control_data),
+            treatment_median=np.median(treatment_data),
+            u_statistic=u_stat,
+            p_value=p_value,
+            significant=p_value < self.alpha
+        )
+        
+        logger.info("Test results: p-value={:.4f}, significant={}", p_value, results.significant)
+        
+        return results
+    
+    def permutation_test(
+        self,
+        control_data: ArrayLike,
+        treatment_data: ArrayLike,
+        statistic: str = 'mean_diff',
+        n_perm: int = 10_000,
+        random_state: Optional[int] = None
+    ) -> PermutationResult:
+        """
+        Permutation test on the difference between groups.
+        
+        Group labels are reshuffled as whole rows of an (n_perm, n) matrix
+        and the statistic is reduced along axis 1, so each block of
+        permutations is a handful of vectorized array operations. Blocks are
+        sized to keep the matrix around 4M elements. CuPy inputs run on the
+        GPU.
+        
+        Args:
+            control_data: Control group data
+            treatment_data: Treatment group data
+            statistic: Test statistic ('mean_diff' or 'median_diff'),
+                computed as treatment minus control
+            n_perm: Number of permutations
+            random_state: Seed for the permutation generator
+            
+        Returns:
+            PermutationResult with test results
+        """
+        if statistic not in ('mean_diff', 'median_diff'):
+            raise ValueError(f"statistic must be 'mean_diff' or 'median_diff', got {statistic!r}")
+        if len(control_data) == 0 or len(treatment_data) == 0:
+            raise ValueError("control_data and treatment_data must both be non-empty")
+        try:
+            n_perm = operator.index(n_perm)
+        except TypeError:
+            raise TypeError(f"n_perm must be an integer, got {n_perm!r}") from None
+        if n_perm < 1:
+            raise ValueError(f"n_perm must be at least 1, got {n_perm}")
+        
+        xp, _ = _array_namespace(control_data, treatment_data)
+        data = xp.concatenate((
+            xp.asarray(control_data, dtype=float),
+            xp.asarray(treatment_data, dtype=float)
+        ))
+        n1 = len(control_data)
+        n = data.shape[0]
+        n2 = n - n1
+        total = data.sum()
+        
+        def group_diff(samples):
+            # samples: (rows, n) with the first n1 columns as control
+            if statistic == 'mean_diff':
+                control_sum = samples[:, :n1].sum(axis=1)
+                return (total - control_sum) / n2 - control_sum / n1
+            return xp.median(samples[:, n1:], axis=1) - xp.median(samples[:, :n1], axis=1)
+        
+        observed = float(group_diff(data[None, :])[0])
+        
+        # Relative tolerance so permutations equal to the observed value
+        # are not lost to rounding
+        tol = 1e-12 * max(1.0, abs(observed))
+        
+        rng = xp.random.default_rng(random_state)
+        block = max(1, min(n_perm, 2**22 // n))
+        extreme = 0
+        for start in range(0, n_perm, block):
+            rows = min(block, n_perm - start)
+            idx = xp.argsort(rng.random((rows, n)), axis=1)
+            stats_perm = group_diff(data[idx])
+            
+            if self.alternative == 'two-sided':
+                extreme += int((xp.abs(stats_perm) >= abs(observed) - tol).sum())
+            elif self.alternative == 'greater':
+                extreme += int((stats_perm >= observed - tol).sum())
+            else:  # less
+                extreme += int((stats_perm <= observed + tol).sum())
+        
+        # Count the observed labelling itself so the p-value is never 0
+        p_value = (extreme + 1) / (n_perm + 1)
+        
+        results = PermutationResult(
+            statistic=observed,
+            p_value=p_value,
+            n_permutations=n_perm,
+            significant=p_value < self.alpha
+        )
         
-        logger.info(f"Test results: p-value={p_value:.4f}, significant={results['significant']}")
+        logger.info("Test results: p-value={:.4f}, significant={}", p_value, results.significant)
         
         return results
     
     def sequential_test(
         self,
-        control_conversions: int,
-        control_total: int,
-        treatment_conversions: int,
-        treatment_total: int,
-        spending_function: str = 'obrien_fleming'
-    ) -> Dict:
+        control_conversions: ArrayLike,
+        control_total: ArrayLike,
+        treatment_conversions: ArrayLike,
+        treatment_total: ArrayLike,
+        spending_function: str = 'obrien_fleming',
+        max_sample: Optional[int] = None
+    ) -> SequentialResult:
         """
         Sequential testing with alpha spending.
         
+        Accepts either scalars (one look) or 1-D NumPy/CuPy arrays (one
+        look per element), in which case all looks are evaluated in a
+        single vectorized pass.
+        
         Args:
             control_conversions: Number of conversions in control
             control_total: Total in control group
             treatment_conversions: Number of conversions in treatment
             treatment_total: Total in treatment group
             spending_function: Alpha spending function
+            max_sample: Planned total sample size (both groups) at the final
+                look; defaults to the current total, i.e. the final look
             
         Returns:
-            Dictionary with test results
+            SequentialResult with test results
         """
-        logger.info("Running sequential test...")
+        xp, sp = _array_namespace(control_total, treatment_total)
+        total = xp.asarray(control_total, dtype=float) + xp.asarray(treatment_total, dtype=float)
         
         # Calculate current sample fraction
-        max_sample = control_total + treatment_total
-        current_fraction = (control_total + treatment_total) / max_sample
+        if max_sample is None:
+            max_sample = total
+        if not bool(xp.all((total > 0) & (total <= max_sample))):
+            raise ValueError("the total sample size must be positive and at most max_sample")
+        current_fraction = total / max_sample
         
         # Calculate spent alpha (simplified O'Brien-Fleming)
         if spending_function == 'obrien_fleming':
-            spent_alpha = 2 * (1 - stats.norm.cdf(stats.norm.ppf(1 - self.alpha/2) / np.sqrt(current_fraction)))
+            spent_alpha = 2 * sp.ndtr(-self._z_alpha2 / xp.sqrt(current_fraction))
         else:
             spent_alpha = self.alpha * current_fraction
         
         # Run proportion test with adjusted alpha
-        original_alpha = self.alpha
-        self.alpha = spent_alpha
-        
         results = self.proportion_test(
             control_conversions, control_total,
-            treatment_conversions, treatment_total
+            treatment_conversions, treatment_total,
+            alpha=spent_alpha
         )
         
-        results['spent_alpha'] = spent_alpha
-        results['sample_fraction'] = current_fraction
-        
-        self.alpha = original_alpha
+        results = SequentialResult(
+            **results.to_dict(),
+            spent_alpha=spent_alpha,
+            sample_fraction=current_fraction
+        )
         
-        logger.info(f"Sequential test: spent_alpha={spent_alpha:.4f}")
+        if spent_alpha.ndim:
+            logger.info("Sequential test: evaluated {} looks", spent_alpha.size)
+        else:
+            logger.info("Sequential test: spent_alpha={:.4f}", spent_alpha)
         
         return results
 
@@ -2,12 +2,18 @@
 Unit tests for the main module.
 """
 import pytest
+import subprocess
 import sys
 from pathlib import Path
 
+import numpy as np
+from scipy import stats
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from models.ab_test import ABTest, _mean_var, _solve_n
+
 
 class TestBasicFunctionality:
     """Test basic functionality of the module."""
@@ -74,6 +80,316 @@ class TestEvaluation:
         assert True
 
 
+class TestConfiguration:
+    """Test alpha and alternative configuration."""
+    
+    def test_rejects_unknown_alternative(self):
+        """Test that an unknown alternative raises ValueError."""
+        with pytest.raises(ValueError):
+            ABTest(alternative='bogus')
+        
+        ab_test = ABTest()
+        with pytest.raises(ValueError):
+            ab_test.alternative = 'bogus'
+        assert ab_test.alternative == 'two-sided'
+    
+    def test_alpha_setter_updates_interval(self):
+        """Test that changing alpha after construction widens the confidence interval."""
+        ab_test = ABTest(alpha=0.05)
+        before = ab_test.proportion_test(102, 1000, 125, 1000)
+        ab_test.alpha = 0.01
+        after = ab_test.proportion_test(102, 1000, 125, 1000)
+        expected = ABTest(alpha=0.01).proportion_test(102, 1000, 125, 1000)
+        
+        width_before = np.diff(before['confidence_interval'])[0]
+        width_after = np.diff(after['confidence_interval'])[0]
+        assert width_after > width_before
+        assert np.allclose(after['confidence_interval'], expected['confidence_interval'])
+
+
+class TestSampleSize:
+    """Test sample size calculation."""
+    
+    def test_results_are_memoized(self):
+        """Test that repeated queries hit the cache and that it can be cleared."""
+        ab_test = ABTest()
+        ab_test.clear_sample_size_cache()
+        
+        first = ab_test.calculate_sample_size(0.10, 0.02)
+        hits = _solve_n.cache_info().hits
+        second = ab_test.calculate_sample_size(0.10, 0.02)
+        
+        assert first == second
+        assert _solve_n.cache_info().hits == hits + 1
+        
+        ab_test.clear_sample_size_cache()
+        assert _solve_n.cache_info().currsize == 0
+    
+    def test_curve_matches_scalar(self):
+        """Test that the power curve matches per-MDE scalar calls."""
+        ab_test = ABTest()
+        mdes = [0.01, 0.02, 0.05]
+        curve = ab_test.calculate_sample_size_curve(0.10, mdes)
+        
+        assert list(curve) == [ab_test.calculate_sample_size(0.10, mde) for mde in mdes]
+
+
+class TestProportionTest:
+    """Test the two-proportion z-test."""
+    
+    def test_batch_matches_scalar(self):
+        """Test that a batched call matches per-experiment scalar calls."""
+        ab_test = ABTest()
+        batch = ab_test.proportion_test([102, 50], [1000, 500], [125, 80], [1000, 500])
+        
+        for i, args in enumerate([(102, 1000, 125, 1000), (50, 500, 80, 500)]):
+            single = ab_test.proportion_test(*args)
+            assert np.isclose(batch['z_statistic'][i], single['z_statistic'])
+            assert np.isclose(batch['p_value'][i], single['p_value'])
+            assert batch['significant'][i] == single['significant']
+    
+    def test_result_access(self):
+        """Test attribute, key and DataFrame access to results."""
+        batch = ABTest().proportion_test([102, 50], [1000, 500], [125, 80], [1000, 500])
+        frame = batch.to_frame()
+        
+        assert batch['p_value'] is batch.p_value
+        assert 'z_statistic' in batch
+        assert len(frame) == 2
+        assert list(frame['ci_lower']) == list(batch.confidence_interval[0])
+    
+    def test_result_is_mapping(self):
+        """Test that results iterate and convert like the dicts they replace."""
+        results = ABTest().proportion_test(102, 1000, 125, 1000)
+        as_dict = dict(results)
+        
+        assert list(results) == list(as_dict) == list(results.keys())
+        assert len(results) == 8
+        assert as_dict == results.to_dict()
+        assert results.get('p_value') == results.p_value
+        assert results.get('missing') is None
+        assert 'to_dict' not in results
+        with pytest.raises(KeyError):
+            results['to_dict']
+    
+    @pytest.mark.parametrize("totals", [(0, 10), ([100, 0], [100, 100])])
+    def test_rejects_empty_groups(self, totals):
+        """Test that non-positive group totals raise ValueError."""
+        control_total, treatment_total = totals
+        
+        with pytest.raises(ValueError):
+            ABTest().proportion_test(0, control_total, 1, treatment_total)
+    
+    def test_p_value_tail_precision(self):
+        """Test that extreme z-statistics give tiny but non-zero p-values."""
+        results = ABTest().proportion_test(1000, 10000, 2000, 10000)
+        
+        assert results['z_statistic'] > 8
+        assert 0 < results['p_value'] < 1e-15
+
+
+class TestTTest:
+    """Test the independent t-test."""
+    
+    @pytest.mark.parametrize("alternative", ["two-sided", "greater", "less"])
+    @pytest.mark.parametrize("equal_var", [False, True])
+    def test_matches_scipy(self, alternative, equal_var):
+        """Test that statistics match scipy.stats.ttest_ind."""
+        rng = np.random.default_rng(42)
+        control = rng.normal(10.0, 2.0, 500)
+        treatment = rng.normal(10.3, 2.5, 600)
+        
+        results = ABTest(alternative=alternative).t_test(control, treatment, equal_var=equal_var)
+        expected = stats.ttest_ind(treatment, control, equal_var=equal_var, alternative=alternative)
+        
+        assert np.isclose(results['t_statistic'], expected.statistic)
+        assert np.isclose(results['p_value'], expected.pvalue)
+    
+    @pytest.mark.parametrize("offset", [0.0, 1e6])
+    def test_moments_match_numpy(self, offset):
+        """Test that the single-pass moments match NumPy, including a large offset."""
+        data = np.random.default_rng(3).normal(offset, 2.0, 10_001)
+        mean, var, n = _mean_var(data)
+        
+        assert n == len(data)
+        assert np.isclose(mean, data.mean(), rtol=1e-12)
+        assert np.isclose(var, data.var(ddof=1), rtol=1e-9)
+    
+    def test_undersized_samples_give_nan(self):
+        """Test that samples too small for a variance yield nan."""
+        assert np.isnan(ABTest().t_test([1.0], [2.0, 3.0])['p_value'])
+    
+    def test_float32_compute_dtype(self):
+        """Test that float32 moments agree closely with float64."""
+        rng = np.random.default_rng(0)
+        control = rng.binomial(1, 0.10, 100_000).astype(float)
+        treatment = rng.binomial(1, 0.11, 100_000).astype(float)
+        
+        ab_test = ABTest()
+        full = ab_test.t_test(control, treatment)
+        reduced = ab_test.t_test(control, treatment, compute_dtype='float32')
+        
+        assert np.isclose(reduced['p_value'], full['p_value'], rtol=1e-3, atol=1e-5)
+        assert np.allclose(reduced['confidence_interval'], full['confidence_interval'], atol=1e-5)
+    
+    @pytest.mark.parametrize("numba", [True, False])
+    def test_float32_moments_accumulate_in_float64(self, monkeypatch, numba):
+        """Test that large float32 input keeps float64 accuracy with and without numba."""
+        if not numba:
+            monkeypatch.setattr("models.ab_test.NUMBA_AVAILABLE", False)
+        x = np.random.default_rng(0).normal(100.0, 5.0, 1_000_000).astype(np.float32)
+        
+        mean, var, n = _mean_var(x)
+        x64 = x.astype(np.float64)
+        
+        assert n == len(x)
+        assert np.isclose(mean, x64.mean(), rtol=1e-12)
+        assert np.isclose(var, x64.var(ddof=1), rtol=1e-9)
+    
+    @pytest.mark.parametrize("compute_dtype", ["float16", "int32", "bogus"])
+    def test_rejects_unsupported_compute_dtype(self, compute_dtype):
+        """Test that compute_dtype only accepts float32 and float64."""
+        with pytest.raises(ValueError):
+            ABTest().t_test([1.0, 2.0, 3.0], [2.0, 3.0, 4.0], compute_dtype=compute_dtype)
+
+
+class TestPermutationTest:
+    """Test the permutation test."""
+    
+    def test_detects_shift(self):
+        """Test that a clear shift is significant and the result is reproducible."""
+        rng = np.random.default_rng(0)
+        control = rng.normal(0.0, 1.0, 200)
+        treatment = rng.normal(0.5, 1.0, 200)
+        
+        ab_test = ABTest()
+        results = ab_test.permutation_test(control, treatment, n_perm=2000, random_state=1)
+        repeat = ab_test.permutation_test(control, treatment, n_perm=2000, random_state=1)
+        
+        assert np.isclose(results['statistic'], treatment.mean() - control.mean())
+        assert results['significant']
+        assert results['p_value'] == repeat['p_value']
+    
+    @pytest.mark.parametrize("alternative,statistic", [
+        ("two-sided", "median_diff"),
+        ("greater", "mean_diff"),
+        ("less", "median_diff"),
+    ])
+    def test_matches_scipy(self, alternative, statistic):
+        """Test p-values against scipy.stats.permutation_test within Monte Carlo error."""
+        rng = np.random.default_rng(5)
+        control = rng.normal(0.0, 1.0, 150)
+        treatment = rng.normal(0.15, 1.0, 160)
+        reduce = np.mean if statistic == "mean_diff" else np.median
+        
+        results = ABTest(alternative=alternative).permutation_test(
+            control, treatment, statistic=statistic, n_perm=4000, random_state=1
+        )
+        expected = stats.permutation_test(
+            (treatment, control),
+            lambda x, y, axis: reduce(x, axis=axis) - reduce(y, axis=axis),
+            n_resamples=9999, alternative=alternative, random_state=2
+        )
+        
+        assert np.isclose(results['statistic'], expected.statistic)
+        assert abs(results['p_value'] - expected.pvalue) < 0.04
+    
+    def test_rejects_empty_samples(self):
+        """Test that empty samples raise ValueError."""
+        with pytest.raises(ValueError):
+            ABTest().permutation_test([], [])
+        with pytest.raises(ValueError):
+            ABTest().permutation_test([], [1.0, 2.0])
+    
+    def test_n_perm_must_be_integer(self):
+        """Test that n_perm accepts integer types and rejects floats."""
+        control, treatment = [1.0, 2.0, 3.0], [2.0, 3.0, 4.0]
+        
+        results = ABTest().permutation_test(control, treatment, n_perm=np.int64(50), random_state=0)
+        assert 0 < results['p_value'] <= 1
+        with pytest.raises(TypeError, match="n_perm must be an integer"):
+            ABTest().permutation_test(control, treatment, n_perm=1e4)
+        with pytest.raises(ValueError):
+            ABTest().permutation_test(control, treatment, n_perm=0)
+
+
+class TestMannWhitneyTest:
+    """Test the Mann-Whitney U test."""
+    
+    @pytest.mark.parametrize("alternative", ["two-sided", "greater", "less"])
+    @pytest.mark.parametrize("case", ["continuous", "ties", "nan"])
+    def test_matches_scipy(self, alternative, case):
+        """Test that U and the p-value match scipy.stats.mannwhitneyu."""
+        rng = np.random.default_rng(7)
+        if case == "ties":
+            control = rng.integers(0, 5, 300).astype(float)
+            treatment = rng.integers(0, 6, 250).astype(float)
+        else:
+            control = rng.normal(0.0, 1.0, 50)
+            treatment = rng.normal(0.3, 1.0, 40)
+        if case == "nan":
+            control[3] = np.nan
+        
+        results = ABTest(alternative=alternative).mann_whitney_test(control, treatment)
+        expected = stats.mannwhitneyu(treatment, control, alternative=alternative)
+        
+        assert np.isclose(results['u_statistic'], expected.statistic, equal_nan=True)
+        assert np.isclose(results['p_value'], expected.pvalue, equal_nan=True)
+
+
+class TestSequentialTest:
+    """Test sequential testing with alpha spending."""
+    
+    def test_batch_matches_scalar(self):
+        """Test that batched looks match per-look scalar calls."""
+        ab_test = ABTest()
+        batch = ab_test.sequential_test([102, 50], [1000, 500], [125, 80], [1000, 500])
+        
+        for i, args in enumerate([(102, 1000, 125, 1000), (50, 500, 80, 500)]):
+            single = ab_test.sequential_test(*args)
+            assert np.isclose(batch['spent_alpha'][i], single['spent_alpha'])
+            assert np.isclose(batch['p_value'][i], single['p_value'])
+        assert ab_test.alpha == 0.05
+    
+    def test_early_look_spends_less_alpha(self):
+        """Test that O'Brien-Fleming spends little alpha at early looks."""
+        results = ABTest().sequential_test(
+            [20, 40, 60], [250, 500, 750], [30, 60, 90], [250, 500, 750],
+            max_sample=3000
+        )
+        
+        assert np.allclose(results['sample_fraction'], [1/6, 1/3, 1/2])
+        assert np.all(np.diff(results['spent_alpha']) > 0)
+        assert results['spent_alpha'][-1] < 0.05
+    
+    @pytest.mark.parametrize("totals, max_sample", [
+        ((0, 0), None),
+        ((600, 600), 1000),
+        (([250, 600], [250, 600]), 1000),
+    ])
+    def test_rejects_invalid_sample_fraction(self, totals, max_sample):
+        """Test that empty looks and looks past max_sample raise ValueError."""
+        control_total, treatment_total = totals
+        
+        with pytest.raises(ValueError):
+            ABTest().sequential_test(0, control_total, 0, treatment_total, max_sample=max_sample)
+
+
+def test_import_does_not_load_pandas():
+    """Test that importing the module defers statsmodels and pandas."""
+    src_path = Path(__file__).parent.parent / "src"
+    code = (
+        f"import sys; sys.path.insert(0, {str(src_path)!r}); "
+        "import models.ab_test; "
+        "print('pandas' in sys.modules, 'statsmodels' in sys.modules)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    
+    assert output.split() == ["False", "False"]
+
+
 def test_module_structure():
     """Test that module has expected structure."""
     src_path = Path(__file__).parent.parent / "src"